@@ -0,0 +1,195 @@
+"""In-process admission control for model-backed chat endpoints.
+
+Each request must pass a token bucket for its menu and one for its session,
+then take one of a fixed number of model-call slots. Requests wait for a
+slot in a bounded queue; when the queue is full (or the wait times out) they
+are rejected straight away with a suggested retry delay, and get their
+tokens back. Waiting happens in the endpoint's threadpool thread, so
+`create_app` checks that slots plus queue fit in PUBLIC_THREADPOOL_SIZE.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from app.config import (
+    CHAT_MAX_CONCURRENT_CALLS,
+    CHAT_MAX_QUEUE,
+    CHAT_QUEUE_TIMEOUT,
+    CHAT_MENU_RATE,
+    CHAT_MENU_BURST,
+    CHAT_SESSION_RATE,
+    CHAT_SESSION_BURST,
+)
+from app.metrics import counter, gauge, histogram
+
+QUEUE_DEPTH = gauge("admission_queue_depth", "Chat requests waiting for a model slot")
+ACTIVE_CALLS = gauge("admission_active_calls", "Model calls currently running")
+REJECTIONS = counter("admission_rejections_total", "Chat requests rejected, by reason")
+WAIT_SECONDS = histogram("admission_wait_seconds", "Time spent waiting for a model slot")
+
+MAX_BUCKETS = 10000
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else 60.0
+
+
+class Slot:
+    """A held model-call slot; release() is idempotent."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        menu_rate: float,
+        menu_burst: int,
+        session_rate: float,
+        session_burst: int,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.menu_limit = (menu_rate, menu_burst)
+        self.session_limit = (session_rate, session_burst)
+
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._buckets: OrderedDict = OrderedDict()
+        self._active = 0
+        self._waiting = 0
+        self._avg_call = 2.0  # EWMA of model call duration, for Retry-After hints
+        QUEUE_DEPTH.set(0)
+        ACTIVE_CALLS.set(0)
+
+    def _bucket(self, key: tuple, limit: tuple, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*limit, now)
+            if len(self._buckets) > MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.refill(now)
+        return bucket
+
+    def check_rate(self, menu_key: str, session_key: str):
+        """Take one token from both the menu and the session bucket, or reject."""
+        now = time.monotonic()
+        with self._lock:
+            session = self._bucket(("session", menu_key, session_key), self.session_limit, now)
+            menu = self._bucket(("menu", menu_key), self.menu_limit, now)
+            for reason, bucket in (("session_rate", session), ("menu_rate", menu)):
+                wait = bucket.wait_time()
+                if wait > 0:
+                    REJECTIONS.inc(reason=reason)
+                    raise AdmissionRejected(reason, wait)
+            session.tokens -= 1
+            menu.tokens -= 1
+
+    def _refund(self, menu_key: str, session_key: str):
+        """Give back the tokens of a request that never got a model slot."""
+        with self._lock:
+            for key, limit in (
+                (("session", menu_key, session_key), self.session_limit),
+                (("menu", menu_key), self.menu_limit),
+            ):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.tokens = min(limit[1], bucket.tokens + 1)
+
+    def _retry_hint(self) -> float:
+        return self._avg_call * (self._waiting + 1) / self.max_concurrent
+
+    def acquire(self) -> Slot:
+        """Wait (bounded) for a model-call slot."""
+        start = time.monotonic()
+        with self._lock:
+            if self._active >= self.max_concurrent:
+                if self._waiting >= self.max_queue:
+                    REJECTIONS.inc(reason="queue_full")
+                    raise AdmissionRejected("queue_full", self._retry_hint())
+
+                self._waiting += 1
+                QUEUE_DEPTH.set(self._waiting)
+                try:
+                    deadline = start + self.queue_timeout
+                    while self._active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            REJECTIONS.inc(reason="queue_timeout")
+                            raise AdmissionRejected("queue_timeout", self._retry_hint())
+                        self._slot_freed.wait(remaining)
+                finally:
+                    self._waiting -= 1
+                    QUEUE_DEPTH.set(self._waiting)
+
+            self._active += 1
+            ACTIVE_CALLS.set(self._active)
+        WAIT_SECONDS.observe(time.monotonic() - start)
+        return Slot(self)
+
+    def _release(self, duration: float):
+        with self._lock:
+            self._active -= 1
+            ACTIVE_CALLS.set(self._active)
+            self._avg_call = 0.9 * self._avg_call + 0.1 * duration
+            self._slot_freed.notify()
+
+    def admit(self, menu_key: str, session_key: str) -> Slot:
+        self.check_rate(menu_key, session_key)
+        try:
+            return self.acquire()
+        except AdmissionRejected:
+            self._refund(menu_key, session_key)
+            raise
+
+
+chat_admission = AdmissionController(
+    CHAT_MAX_CONCURRENT_CALLS,
+    CHAT_MAX_QUEUE,
+    CHAT_QUEUE_TIMEOUT,
+    CHAT_MENU_RATE,
+    CHAT_MENU_BURST,
+    CHAT_SESSION_RATE,
+    CHAT_SESSION_BURST,
+)
@@ -6,6 +6,46 @@ env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path)
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
+# "google" for Gemini, "fake" for the offline stand-in used by benchmarks/
+GENAI_BACKEND = os.getenv("GENAI_BACKEND", "google")
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./serveur_ai.db")
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 STORAGE_DIR = os.getenv("STORAGE_DIR", "./storage")
+
+# "local" keeps files under STORAGE_DIR; "objectstore" uses a flat bucket in
+# OBJECT_STORE_DIR (stand-in for S3-style storage). URLs are the same for both.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+OBJECT_STORE_DIR = os.getenv("OBJECT_STORE_DIR", "./object_store")
+# Also write .gz / .webp siblings of stored files for content negotiation
+STORAGE_VARIANTS = os.getenv("STORAGE_VARIANTS", "false").lower() in ("1", "true", "yes")
+
+# Deployment roles: "public" serves menus + chat, "ingest" handles PDF uploads,
+# "all" serves both from a single process (default, for local development).
+APP_ROLE = os.getenv("APP_ROLE", "all")
+
+PUBLIC_PORT = int(os.getenv("PUBLIC_PORT", "8000"))
+PUBLIC_WORKERS = int(os.getenv("PUBLIC_WORKERS", "2"))
+PUBLIC_MAX_CONCURRENCY = int(os.getenv("PUBLIC_MAX_CONCURRENCY", "200"))
+PUBLIC_QUEUE_TIMEOUT = float(os.getenv("PUBLIC_QUEUE_TIMEOUT", "5"))
+PUBLIC_THREADPOOL_SIZE = int(os.getenv("PUBLIC_THREADPOOL_SIZE", "40"))
+
+INGEST_PORT = int(os.getenv("INGEST_PORT", "8001"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+INGEST_MAX_CONCURRENCY = int(os.getenv("INGEST_MAX_CONCURRENCY", "2"))
+INGEST_QUEUE_TIMEOUT = float(os.getenv("INGEST_QUEUE_TIMEOUT", "60"))
+INGEST_THREADPOOL_SIZE = int(os.getenv("INGEST_THREADPOOL_SIZE", "4"))
+
+# Responses smaller than this (bytes) are sent uncompressed
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# Number of encoded public menu payloads (per menu + language) kept in memory
+PAYLOAD_CACHE_SIZE = int(os.getenv("PAYLOAD_CACHE_SIZE", "256"))
+
+# Chat admission control (per worker process)
+CHAT_MAX_CONCURRENT_CALLS = int(os.getenv("CHAT_MAX_CONCURRENT_CALLS", "8"))
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "16"))
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "10"))
+# Token buckets: sustained requests per second and burst size
+CHAT_MENU_RATE = float(os.getenv("CHAT_MENU_RATE", "2"))
+CHAT_MENU_BURST = int(os.getenv("CHAT_MENU_BURST", "20"))
+CHAT_SESSION_RATE = float(os.getenv("CHAT_SESSION_RATE", "0.2"))
+CHAT_SESSION_BURST = int(os.getenv("CHAT_SESSION_BURST", "5"))
@@ -1,44 +1,141 @@
+import os
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse
 from app.db import engine, Base
-from app.routers import menu, public
+from app import models  # noqa: F401  registers tables for create_all
 from app.services.file_service import ensure_dirs
-from app.config import STORAGE_DIR
+from app.middleware import ConcurrencyLimitMiddleware, RequestContextMiddleware
+from app.metrics import render_metrics, recent_spans
+from app.config import (
+    APP_ROLE,
+    PUBLIC_MAX_CONCURRENCY,
+    PUBLIC_QUEUE_TIMEOUT,
+    PUBLIC_THREADPOOL_SIZE,
+    INGEST_MAX_CONCURRENCY,
+    INGEST_QUEUE_TIMEOUT,
+    INGEST_THREADPOOL_SIZE,
+    CHAT_MAX_CONCURRENT_CALLS,
+    CHAT_MAX_QUEUE,
+)
 
 ensure_dirs()
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(
-    title="ServeurAI", description="Restaurant Menu AI Assistant", version="1.0.0"
-)
+ROLES = ("all", "public", "ingest")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.mount("/storage", StaticFiles(directory=STORAGE_DIR), name="storage")
+def create_app(role: str = "all") -> FastAPI:
+    """Build the API for a deployment role.
+
+    - "public": menu reads, chat and static storage (QR scan traffic)
+    - "ingest": PDF upload and menu extraction
+    - "all": both, in one process
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown APP_ROLE {role!r}, expected one of {ROLES}")
+
+    if role == "ingest":
+        max_concurrency = INGEST_MAX_CONCURRENCY
+        queue_timeout = INGEST_QUEUE_TIMEOUT
+        threadpool_size = INGEST_THREADPOOL_SIZE
+    else:
+        max_concurrency = PUBLIC_MAX_CONCURRENCY
+        queue_timeout = PUBLIC_QUEUE_TIMEOUT
+        threadpool_size = PUBLIC_THREADPOOL_SIZE
+        # Chat calls and queued chat requests each hold a threadpool thread;
+        # leave some for menu reads or they starve behind a chat burst
+        if CHAT_MAX_CONCURRENT_CALLS + CHAT_MAX_QUEUE >= threadpool_size:
+            raise ValueError(
+                "CHAT_MAX_CONCURRENT_CALLS + CHAT_MAX_QUEUE "
+                f"({CHAT_MAX_CONCURRENT_CALLS} + {CHAT_MAX_QUEUE}) must be below "
+                f"PUBLIC_THREADPOOL_SIZE ({threadpool_size})"
+            )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Sync endpoints and create_menu run in anyio's threadpool
+        to_thread.current_default_thread_limiter().total_tokens = threadpool_size
+        yield
+
+    app = FastAPI(
+        title="ServeurAI",
+        description="Restaurant Menu AI Assistant",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    app.state.role = role
+
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        max_concurrency=max_concurrency,
+        queue_timeout=queue_timeout,
+    )
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(RequestContextMiddleware)
+
+    # Routers are imported per role so the public app never loads the
+    # ingestion stack (Gemini extraction, pdf2image)
+    if role in ("all", "public"):
+        from app.routers import public, storage
+
+        app.include_router(storage.router)
+        app.include_router(public.router)
+
+        @app.get("/menu/{slug}")
+        async def redirect_to_frontend(slug: str):
+            """Redirect QR code scans to frontend"""
+            return RedirectResponse(url=f"http://localhost:5173/menu/{slug}")
+
+    if role in ("all", "ingest"):
+        from app.routers import menu
+
+        app.include_router(menu.router)
+
+    @app.get("/")
+    async def root():
+        return {"status": "ServeurAI API Running", "version": "1.0.0", "role": role}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(
+            render_metrics(), media_type="text/plain; version=0.0.4"
+        )
+
+    @app.get("/metrics/spans", include_in_schema=False)
+    async def spans(request_id: str | None = None, job_id: str | None = None):
+        """Recent stage timings of this worker, by request or ingestion job"""
+        return {"worker": os.getpid(), "spans": recent_spans(request_id, job_id)}
 
-app.include_router(menu.router)
-app.include_router(public.router)
+    return app
 
 
-@app.get("/")
-async def root():
-    return {"status": "ServeurAI API Running", "version": "1.0.0"}
+def create_public_app() -> FastAPI:
+    """Factory for `uvicorn app.main:create_public_app --factory`."""
+    return create_app("public")
 
 
-@app.get("/health")
-async def health():
-    return {"status": "healthy"}
+def create_ingest_app() -> FastAPI:
+    """Factory for `uvicorn app.main:create_ingest_app --factory`."""
+    return create_app("ingest")
 
 
-@app.get("/menu/{slug}")
-async def redirect_to_frontend(slug: str):
-    """Redirect QR code scans to frontend"""
-    return RedirectResponse(url=f"http://localhost:5173/menu/{slug}")
+def __getattr__(name: str):
+    # `app.main:app` is built on first access, so `--factory` processes
+    # don't also build an unused APP_ROLE app at import time
+    if name == "app":
+        globals()["app"] = create_app(APP_ROLE)
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,245 @@
+"""In-process metrics and lightweight tracing, exposed at /metrics.
+
+Histograms and counters are kept per worker process and rendered in the
+Prometheus text format; nothing is aggregated across `--workers`, so each
+scrape or span lookup only sees the worker that answered it. Every timed stage is also recorded as a span tagged
+with the current request ID and ingestion job ID, kept in a small ring buffer.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger("app.metrics")
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+job_id_var = contextvars.ContextVar("job_id", default=None)
+
+_lock = threading.Lock()
+_metrics: dict[str, "_Metric"] = {}
+_spans: deque = deque(maxlen=2000)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: dict = {}
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with _lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{_format_labels(key)} {value}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with _lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_value(self, key: tuple, value) -> list[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{_format_labels(key, (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+        lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _lock:
+        return _metrics.setdefault(metric.name, metric)
+
+
+def counter(name: str, help: str) -> Counter:
+    return _register(Counter(name, help))
+
+
+def gauge(name: str, help: str) -> Gauge:
+    return _register(Gauge(name, help))
+
+
+def histogram(name: str, help: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, buckets))
+
+
+def render_metrics() -> str:
+    with _lock:
+        metrics = list(_metrics.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Shared metrics
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route"
+)
+STAGE_SECONDS = histogram("stage_duration_seconds", "Latency of internal stages")
+# Tells counter resets apart from scrapes landing on another worker
+PROCESS_START = gauge("process_start_time_seconds", "Worker process start time")
+PROCESS_START.set(time.time())
+MODEL_PROMPT_BYTES = histogram(
+    "model_prompt_bytes", "Size of prompts sent to the model", SIZE_BUCKETS
+)
+MODEL_RESPONSE_BYTES = histogram(
+    "model_response_bytes", "Size of model responses", SIZE_BUCKETS
+)
+CACHE_REQUESTS = counter("cache_requests_total", "Cache lookups by cache and result")
+DB_QUERY_SECONDS = histogram("db_query_duration_seconds", "Database query latency")
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def record_span(name: str, duration: float, **labels):
+    span = {
+        "name": name,
+        "duration_ms": round(duration * 1000, 3),
+        "request_id": request_id_var.get(),
+        "job_id": job_id_var.get(),
+        "end": time.time(),
+        **labels,
+    }
+    _spans.append(span)
+    logger.debug("span %s", span)
+
+
+def recent_spans(request_id: str | None = None, job_id: str | None = None) -> list[dict]:
+    spans = list(_spans)
+    if request_id:
+        spans = [s for s in spans if s["request_id"] == request_id]
+    if job_id:
+        spans = [s for s in spans if s["job_id"] == job_id]
+    return spans
+
+
+@contextmanager
+def timed(stage: str, **labels):
+    """Record how long the block takes as `stage_duration_seconds{stage=...}` and a span."""
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_SECONDS.observe(duration, stage=stage, status=status, **labels)
+        record_span(stage, duration, status=status, **labels)
+
+
+@contextmanager
+def job_context(job_id: str | None = None):
+    """Tag spans recorded inside the block with an ingestion job ID."""
+    token = job_id_var.set(job_id or new_id())
+    try:
+        yield job_id_var.get()
+    finally:
+        job_id_var.reset(token)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_model_io(call: str, prompt_bytes: int, response_bytes: int):
+    MODEL_PROMPT_BYTES.observe(prompt_bytes, call=call)
+    MODEL_RESPONSE_BYTES.observe(response_bytes, call=call)
+
+
+def instrument_engine(engine):
+    """Time every SQL statement executed through `engine`."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        DB_QUERY_SECONDS.observe(time.perf_counter() - start, operation=operation)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from app.config import COMPRESS_MIN_SIZE, PAYLOAD_CACHE_SIZE
+from app.metrics import record_cache
+
+try:
+    import brotli
+except ImportError:  # gzip-only when the brotli wheel isn't available
+    brotli = None
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+@dataclass
+class EncodedPayload:
+    """A JSON body serialized once, with its compressed variants."""
+
+    body: bytes
+    etag: str
+    gzip: bytes | None = None
+    br: bytes | None = None
+
+
+def encode_payload(obj, cacheable: bool = False) -> EncodedPayload:
+    """Serialize `obj`; cacheable payloads are also precompressed.
+
+    Cached payloads are compressed once with slower, denser settings. Others
+    are compressed in `payload_response`, only for the negotiated encoding.
+    """
+    body = dumps(obj)
+    payload = EncodedPayload(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+    if cacheable and len(body) >= COMPRESS_MIN_SIZE:
+        payload.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            payload.br = brotli.compress(body, quality=9, mode=brotli.MODE_TEXT)
+    return payload
+
+
+def accepted_values(header: str | None) -> set[str]:
+    """Values an Accept / Accept-Encoding header allows; q=0 means refused."""
+    values = set()
+    for part in (header or "").split(","):
+        name, *params = part.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        refused = False
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    refused = float(value) <= 0
+                except ValueError:
+                    refused = True
+        if not refused:
+            values.add(name)
+    return values
+
+
+def payload_response(
+    request: Request, payload: EncodedPayload, cache_control: str | None = None
+) -> Response:
+    """JSON response negotiated against Accept-Encoding (brotli, then gzip)."""
+    encoding = None
+    if len(payload.body) >= COMPRESS_MIN_SIZE:
+        accepted = accepted_values(request.headers.get("accept-encoding"))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted or "*" in accepted:
+            encoding = "gzip"
+
+    # Strong validators differ per content-coding, as for storage variants
+    etag = payload.etag if encoding is None else f'{payload.etag[:-1]}-{encoding}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    body = payload.body
+    if encoding == "br":
+        body = payload.br or brotli.compress(body, quality=4, mode=brotli.MODE_TEXT)
+    elif encoding == "gzip":
+        body = payload.gzip or gzip.compress(body, compresslevel=6, mtime=0)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class PayloadCache:
+    """Small thread-safe LRU of encoded payloads."""
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> EncodedPayload | None:
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is not None:
+                self._items.move_to_end(key)
+        record_cache(self.name, payload is not None)
+        return payload
+
+    def set(self, key, payload: EncodedPayload):
+        with self._lock:
+            self._items[key] = payload
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+menu_payloads = PayloadCache("menu_payload", PAYLOAD_CACHE_SIZE)
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db import get_db
-from app.schemas import MenuCreateResponse
+from app.schemas import MenuCreateResponse, QRBatchRequest, QRBatchResponse
 from app.services.file_service import save_pdf, is_valid_pdf
-from app.services.menu_service import create_menu
+from app.services.menu_service import create_menu, list_menu_slugs
+from app.services.qr_service import generate_qr_batch
 
 router = APIRouter(prefix="/api/menus", tags=["menus"])
 
@@ -25,7 +27,10 @@ async def upload_menu(
     
     pdf_path = save_pdf(content, pdf.filename or "menu.pdf")
     
-    menu, qr_url = create_menu(db, restaurant_name, pdf_path, languages)
+    # Extraction and translation block for a long time; keep them off the event loop
+    menu, qr_url = await run_in_threadpool(
+        create_menu, db, restaurant_name, pdf_path, languages
+    )
     
     from app.config import BASE_URL
     public_url = f"{BASE_URL}/menu/{menu.slug}"
@@ -36,3 +41,19 @@ async def upload_menu(
         public_url=public_url,
         qr_url=qr_url
     )
+
+
+@router.post("/qr", response_model=QRBatchResponse)
+def regenerate_qr_codes(request: QRBatchRequest, db: Session = Depends(get_db)):
+    """Render QR codes for many menus at once (e.g. after a BASE_URL change)."""
+    slugs = list_menu_slugs(db, request.slugs)
+    try:
+        results = generate_qr_batch(
+            slugs, tuple(request.formats), tuple(request.sizes), prune=request.prune
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return QRBatchResponse(
+        generated=sum(len(urls) for urls in results.values()), qr_urls=results
+    )
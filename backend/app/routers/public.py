@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+import weakref
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db import get_db
@@ -11,8 +12,21 @@ from app.schemas import (
 from app.services.menu_service import (
     get_menu_by_slug,
     get_menu_data,
+    menu_languages,
     get_full_menu_data,
 )
+from app.admission import chat_admission, AdmissionRejected
+from app.routers.storage import storage_response
+from app.responses import encode_payload, payload_response, menu_payloads
+from app.services.storage_service import IMMUTABLE_CACHE_CONTROL
+from app.services.qr_service import (
+    render_qr,
+    qr_digest,
+    QR_FORMATS,
+    QR_SIZES,
+    QR_MEDIA_TYPES,
+    DEFAULT_QR_SIZE,
+)
 from app.services.chat_service import chat_about_menu, chat_about_menu_stream
 from app.services.conversation_service import (
     get_conversation_messages,
@@ -24,24 +38,75 @@ router = APIRouter(prefix="/api/public", tags=["public"])
 
 
 @router.get("/menus/{slug}", response_model=PublicMenuResponse)
-def get_public_menu(slug: str, lang: str = "en", db: Session = Depends(get_db)):
+def get_public_menu(
+    slug: str, request: Request, lang: str = "en", db: Session = Depends(get_db)
+):
+    menu = get_menu_by_slug(db, slug)
+    if not menu:
+        raise HTTPException(status_code=404, detail="Menu not found")
+
+    # Menus never change after upload, so the encoded body is cached per language.
+    # Other ?lang= values get the untranslated menu, built per request so they
+    # can't push real menus out of the LRU.
+    if lang not in menu_languages(menu):
+        data = PublicMenuResponse(**get_menu_data(menu, lang)).model_dump()
+        payload = encode_payload(data)
+        return payload_response(request, payload, cache_control="public, max-age=60")
+
+    cache_key = (menu.id, lang)
+    payload = menu_payloads.get(cache_key)
+    if payload is None:
+        data = PublicMenuResponse(**get_menu_data(menu, lang)).model_dump()
+        payload = encode_payload(data, cacheable=True)
+        menu_payloads.set(cache_key, payload)
+
+    return payload_response(request, payload, cache_control="public, max-age=60")
+
+
+@router.get("/menus/{slug}/qr.{fmt}")
+def get_menu_qr(
+    slug: str,
+    fmt: str,
+    request: Request,
+    size: int = DEFAULT_QR_SIZE,
+    v: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """QR code image, rendered on first request and served from disk afterwards"""
+    if fmt not in QR_FORMATS:
+        raise HTTPException(status_code=404, detail="Unsupported QR format")
+    if size not in QR_SIZES:
+        raise HTTPException(status_code=400, detail=f"Size must be one of {QR_SIZES}")
+    if fmt == "svg":
+        size = DEFAULT_QR_SIZE
+
     menu = get_menu_by_slug(db, slug)
     if not menu:
         raise HTTPException(status_code=404, detail="Menu not found")
 
-    data = get_menu_data(menu, lang)
-    return PublicMenuResponse(**data)
+    # Versioned URLs never change content; unversioned ones may after a BASE_URL change
+    versioned = v == qr_digest(slug, fmt, size)
+    key = render_qr(slug, fmt, size)
+    return storage_response(
+        request,
+        key,
+        media_type=QR_MEDIA_TYPES[fmt],
+        cache_control=IMMUTABLE_CACHE_CONTROL if versioned else "public, max-age=300",
+    )
 
 
-@router.get("/menus/{slug}/conversation")
-def get_conversation(slug: str, session_id: str, db: Session = Depends(get_db)):
+@router.get("/menus/{slug}/conversation", response_model=ConversationResponse)
+def get_conversation(
+    slug: str, session_id: str, request: Request, db: Session = Depends(get_db)
+):
     """Get conversation history for a session"""
     menu = get_menu_by_slug(db, slug)
     if not menu:
         raise HTTPException(status_code=404, detail="Menu not found")
 
     messages = get_conversation_messages(db, menu.id, session_id)
-    return ConversationResponse(messages=messages)
+    payload = encode_payload(ConversationResponse(messages=messages).model_dump())
+    return payload_response(request, payload, cache_control="private, no-cache")
 
 
 @router.delete("/menus/{slug}/conversation")
@@ -55,8 +120,28 @@ def delete_conversation(slug: str, session_id: str, db: Session = Depends(get_db
     return {"status": "cleared"}
 
 
+def _admit_chat(slug: str, request: ChatRequest, http_request: Request):
+    """Rate-limit per menu and session, then wait for a model-call slot (or 429)."""
+    session_key = request.session_id or (
+        http_request.client.host if http_request.client else "anonymous"
+    )
+    try:
+        return chat_admission.admit(slug, session_key)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many chat requests ({e.reason}), please retry",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
 @router.post("/menus/{slug}/chat", response_model=ChatResponse)
-def chat_with_menu(slug: str, request: ChatRequest, db: Session = Depends(get_db)):
+def chat_with_menu(
+    slug: str,
+    request: ChatRequest,
+    http_request: Request,
+    db: Session = Depends(get_db),
+):
     menu = get_menu_by_slug(db, slug)
     if not menu:
         raise HTTPException(status_code=404, detail="Menu not found")
@@ -71,7 +156,8 @@ def chat_with_menu(slug: str, request: ChatRequest, db: Session = Depends(get_db
         )
         full_data["wines"] = translations[lang].get("wines", full_data.get("wines", []))
 
-    answer = chat_about_menu(full_data, lang, request.messages)
+    with _admit_chat(slug, request, http_request):
+        answer = chat_about_menu(full_data, lang, request.messages)
 
     if request.session_id:
         messages_to_save = request.messages + [{"role": "assistant", "content": answer}]
@@ -82,7 +168,10 @@ def chat_with_menu(slug: str, request: ChatRequest, db: Session = Depends(get_db
 
 @router.post("/menus/{slug}/chat/stream")
 def chat_with_menu_stream(
-    slug: str, request: ChatRequest, db: Session = Depends(get_db)
+    slug: str,
+    request: ChatRequest,
+    http_request: Request,
+    db: Session = Depends(get_db),
 ):
     """Streaming chat endpoint using Server-Sent Events."""
     menu = get_menu_by_slug(db, slug)
@@ -99,6 +188,8 @@ def chat_with_menu_stream(
         )
         full_data["wines"] = translations[lang].get("wines", full_data.get("wines", []))
 
+    # The slot is held until the stream finishes, not just until we return
+    slot = _admit_chat(slug, request, http_request)
     collected_response = []
 
     def generate():
@@ -119,9 +210,15 @@ def chat_with_menu_stream(
             yield "data: [DONE]\n\n"
         except Exception as e:
             yield f"data: [ERROR] {str(e)}\n\n"
+        finally:
+            slot.release()
+
+    stream = generate()
+    # Covers streams that are never started, e.g. the client went away first
+    weakref.finalize(stream, slot.release)
 
     return StreamingResponse(
-        generate(),
+        stream,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
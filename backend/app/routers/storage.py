@@ -0,0 +1,78 @@
+from mimetypes import guess_type
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from app.responses import accepted_values
+from app.services.storage_service import (
+    storage,
+    validate_key,
+    IMMUTABLE_CACHE_CONTROL,
+    DEFAULT_CACHE_CONTROL,
+)
+
+router = APIRouter(prefix="/storage", tags=["storage"])
+
+
+class StorageFileResponse(FileResponse):
+    """FileResponse with larger reads for big PDFs.
+
+    Range / If-Range handling comes from Starlette's FileResponse.
+    """
+
+    chunk_size = 256 * 1024
+
+
+def storage_response(
+    request: Request,
+    key: str,
+    media_type: str | None = None,
+    cache_control: str | None = None,
+) -> Response:
+    """Serve a stored file with a strong ETag, caching headers and variant negotiation."""
+    try:
+        validate_key(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    stored = storage.stat(key)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    if cache_control is None:
+        cache_control = IMMUTABLE_CACHE_CONTROL if stored.immutable else DEFAULT_CACHE_CONTROL
+    headers = {"ETag": stored.etag, "Cache-Control": cache_control}
+
+    path = stored.path
+    vary = []
+    if key.endswith(".png"):
+        vary.append("Accept")
+        if "image/webp" in accepted_values(request.headers.get("accept")):
+            webp = storage.stat(f"{key}.webp")
+            if webp is not None:
+                path, media_type = webp.path, "image/webp"
+                headers["ETag"] = f'{stored.etag[:-1]}-webp"'
+    elif "range" not in request.headers:
+        gz = storage.stat(f"{key}.gz")
+        if gz is not None:
+            vary.append("Accept-Encoding")
+            accepted = accepted_values(request.headers.get("accept-encoding"))
+            if "gzip" in accepted or "*" in accepted:
+                path = gz.path
+                headers["Content-Encoding"] = "gzip"
+                headers["ETag"] = f'{stored.etag[:-1]}-gzip"'
+    if vary:
+        headers["Vary"] = ", ".join(vary)
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    if media_type is None:
+        media_type = guess_type(key)[0] or "application/octet-stream"
+    return StorageFileResponse(path, media_type=media_type, headers=headers)
+
+
+@router.api_route("/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def get_stored_file(key: str, request: Request):
+    if key.endswith((".gz", ".webp")):
+        # Variants are only reachable through content negotiation
+        raise HTTPException(status_code=404, detail="Not found")
+    return storage_response(request, key)
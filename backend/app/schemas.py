@@ -9,6 +9,18 @@ class MenuCreateResponse(BaseModel):
     qr_url: str
 
 
+class QRBatchRequest(BaseModel):
+    slugs: list[str] | None = None  # None regenerates every menu
+    formats: list[str] = ["png", "svg"]
+    sizes: list[int] = [512]
+    prune: bool = False  # delete this slug's renders not covered by formats/sizes
+
+
+class QRBatchResponse(BaseModel):
+    generated: int
+    qr_urls: dict[str, list[str]]
+
+
 class MenuItem(BaseModel):
     name: str
     description: Optional[str] = None
@@ -1,13 +1,19 @@
 import json
+import time
 from typing import Generator
-from google import genai
-from app.config import GOOGLE_API_KEY
+from app.services.genai_client import get_client
+from app.metrics import timed, record_model_io, record_span, STAGE_SECONDS
 
 MODEL = "gemini-2.5-flash"
 
 LANG_NAMES = {"en": "English", "fr": "French", "es": "Spanish"}
 
 
+def _lang_label(lang: str) -> str:
+    """Bound metric label cardinality: unknown client languages become "other"."""
+    return lang if lang in LANG_NAMES else "other"
+
+
 def build_chat_contents(
     menu_data: dict, lang: str, messages: list[dict]
 ) -> tuple[str, list]:
@@ -51,30 +57,59 @@ Menu data (your source of truth):
     return system_prompt, all_contents
 
 
+def _prompt_size(contents: list[dict]) -> int:
+    return sum(len(part["text"]) for content in contents for part in content["parts"])
+
+
 def chat_about_menu(menu_data: dict, lang: str, messages: list[dict]) -> str:
     """Non-streaming chat (for fallback)."""
-    client = genai.Client(api_key=GOOGLE_API_KEY)
+    client = get_client()
     _, all_contents = build_chat_contents(menu_data, lang, messages)
 
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=all_contents,
-    )
-    return response.text or ""
+    with timed("chat", lang=_lang_label(lang)):
+        response = client.models.generate_content(
+            model=MODEL,
+            contents=all_contents,
+        )
+    answer = response.text or ""
+    record_model_io("chat", _prompt_size(all_contents), len(answer))
+    return answer
 
 
 def chat_about_menu_stream(
     menu_data: dict, lang: str, messages: list[dict]
 ) -> Generator[str, None, None]:
     """Streaming chat that yields text chunks."""
-    client = genai.Client(api_key=GOOGLE_API_KEY)
+    client = get_client()
     _, all_contents = build_chat_contents(menu_data, lang, messages)
-
-    response = client.models.generate_content_stream(
-        model=MODEL,
-        contents=all_contents,
-    )
-
-    for chunk in response:
-        if chunk.text:
-            yield chunk.text
+    label = _lang_label(lang)
+
+    start = time.perf_counter()
+    response_size = 0
+    first_token = True
+    status = "error"
+
+    try:
+        response = client.models.generate_content_stream(
+            model=MODEL,
+            contents=all_contents,
+        )
+
+        for chunk in response:
+            if chunk.text:
+                if first_token:
+                    first_token = False
+                    ttft = time.perf_counter() - start
+                    STAGE_SECONDS.observe(
+                        ttft, stage="chat_first_token", status="ok", lang=label
+                    )
+                    record_span("chat_first_token", ttft, lang=label)
+                response_size += len(chunk.text)
+                yield chunk.text
+        status = "ok"
+    finally:
+        # Also reached when the client disconnects mid-stream
+        total = time.perf_counter() - start
+        STAGE_SECONDS.observe(total, stage="chat_stream", status=status, lang=label)
+        record_span("chat_stream", total, status=status, lang=label)
+        record_model_io("chat_stream", _prompt_size(all_contents), response_size)
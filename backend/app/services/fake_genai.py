@@ -0,0 +1,151 @@
+"""Deterministic local stand-in for the google-genai client.
+
+Selected with GENAI_BACKEND=fake. Mirrors the parts of `genai.Client` the
+app uses (`models.generate_content` / `models.generate_content_stream`):
+
+- menu extraction returns a random menu, seeded by the prompt (the same
+  generators back benchmarks/synthetic.py)
+- translation echoes the JSON embedded in the prompt
+- chat returns filler text, streamed in fixed-size chunks
+
+Tuned through environment variables:
+
+    FAKE_GENAI_LATENCY_MS      delay before a response / the first chunk (200)
+    FAKE_GENAI_CHUNK_SIZE      characters per streamed chunk (24)
+    FAKE_GENAI_CHUNK_DELAY_MS  delay between streamed chunks (20)
+    FAKE_GENAI_RESPONSE_CHARS  length of chat answers (400)
+    FAKE_GENAI_MENU_SECTIONS / _ITEMS / _WINES   extracted menu shape (8 / 12 / 60)
+"""
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from app.services.json_extract import extract_json
+
+WORDS = (
+    "agneau boeuf canard saumon cabillaud truffe champignons poireaux carottes "
+    "pommes frites salade roquette parmesan chevre miel thym romarin citron "
+    "beurre blanc sauce vierge jus reduit confit roti grille poele fume "
+    "chocolat vanille caramel fraises framboises creme brulee tarte fine "
+    "risotto gnocchi ravioles burrata tomates anciennes huile olive basilic"
+).split()
+REGIONS = ["Bordeaux", "Bourgogne", "Loire", "Rhone", "Alsace", "Champagne", "Provence"]
+GRAPES = ["Merlot", "Pinot Noir", "Chardonnay", "Syrah", "Sauvignon", "Grenache"]
+ITEM_TAGS = ["meat", "fish", "vegetarian", "spicy", "dessert", "starter", "cheese"]
+WINE_TYPES = ["red", "white", "rose", "sparkling"]
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+@dataclass
+class FakeResponse:
+    text: str
+
+
+def phrase(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_sections(rng: random.Random, sections: int, items: int) -> list[dict]:
+    return [
+        {
+            "title": phrase(rng, 2).title(),
+            "items": [
+                {
+                    "name": phrase(rng, rng.randint(2, 5)).capitalize(),
+                    "description": phrase(rng, rng.randint(4, 8))[:50],
+                    "price": round(rng.uniform(6, 45), 2),
+                    "tags": rng.sample(ITEM_TAGS, rng.randint(1, 3)),
+                }
+                for _ in range(items)
+            ],
+        }
+        for _ in range(sections)
+    ]
+
+
+def make_wines(rng: random.Random, wines: int) -> list[dict]:
+    return [
+        {
+            "name": f"Chateau {phrase(rng, 2).title()} {rng.randint(2005, 2022)}",
+            "type": rng.choice(WINE_TYPES),
+            "region": rng.choice(REGIONS),
+            "grape": rng.choice(GRAPES),
+            "price": round(rng.uniform(24, 320), 2),
+            "pairing_tags": rng.sample(ITEM_TAGS[:4], rng.randint(1, 2)),
+        }
+        for _ in range(wines)
+    ]
+
+
+def _prompt_text(contents: list[dict]) -> str:
+    return "\n".join(
+        part["text"]
+        for content in contents
+        for part in content["parts"]
+        if "text" in part
+    )
+
+
+class FakeModels:
+    def __init__(self):
+        self.latency = _env_int("FAKE_GENAI_LATENCY_MS", 200) / 1000
+        self.chunk_size = _env_int("FAKE_GENAI_CHUNK_SIZE", 24)
+        self.chunk_delay = _env_int("FAKE_GENAI_CHUNK_DELAY_MS", 20) / 1000
+        self.response_chars = _env_int("FAKE_GENAI_RESPONSE_CHARS", 400)
+        self.menu_shape = (
+            _env_int("FAKE_GENAI_MENU_SECTIONS", 8),
+            _env_int("FAKE_GENAI_MENU_ITEMS", 12),
+            _env_int("FAKE_GENAI_MENU_WINES", 60),
+        )
+
+    def _seed(self, prompt: str) -> int:
+        return int.from_bytes(hashlib.sha256(prompt.encode()).digest()[:8], "big")
+
+    def _answer(self, prompt: str) -> str:
+        if "Extract menu data" in prompt:
+            rng = random.Random(self._seed(prompt))
+            sections, items, wines = self.menu_shape
+            menu = {
+                "restaurant_name": "Fake Bistro",
+                "currency": "EUR",
+                "sections": make_sections(rng, sections, items),
+                "wines": make_wines(rng, wines),
+            }
+            text = json.dumps(menu, ensure_ascii=False, indent=2)
+            return "```json\n" + text + "\n```"
+
+        if prompt.startswith("Translate to"):
+            expect = "array" if "JSON array" in prompt else "object"
+            payload = extract_json(prompt, expect=expect)
+            return "```json\n" + json.dumps(payload, ensure_ascii=False) + "\n```"
+
+        rng = random.Random(self._seed(prompt))
+        words = []
+        length = 0
+        while length < self.response_chars:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return "I'd suggest the **" + " ".join(words)[: self.response_chars] + "**."
+
+    def generate_content(self, model: str, contents: list[dict], config=None):
+        time.sleep(self.latency)
+        return FakeResponse(self._answer(_prompt_text(contents)))
+
+    def generate_content_stream(self, model: str, contents: list[dict], config=None):
+        answer = self._answer(_prompt_text(contents))
+        time.sleep(self.latency)
+        for i in range(0, len(answer), self.chunk_size):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield FakeResponse(answer[i : i + self.chunk_size])
+
+
+class FakeClient:
+    def __init__(self, api_key: str | None = None):
+        self.models = FakeModels()
@@ -1,6 +1,7 @@
+import hashlib
 import os
-import secrets
 from app.config import STORAGE_DIR
+from app.services.storage_service import storage, save_file
 
 
 def ensure_dirs():
@@ -11,15 +12,15 @@ def ensure_dirs():
 
 def save_pdf(content: bytes, original_filename: str) -> str:
     ensure_dirs()
-    token = secrets.token_hex(8)
+    # Content-hashed name: identical uploads share one immutable file
+    token = hashlib.sha256(content).hexdigest()[:16]
     safe_name = os.path.basename(original_filename).replace(" ", "_")
     if not safe_name.lower().endswith(".pdf"):
         safe_name += ".pdf"
-    filename = f"{token}_{safe_name}"
-    path = os.path.join(STORAGE_DIR, "uploads", filename)
-    with open(path, "wb") as f:
-        f.write(content)
-    return path
+    key = f"uploads/{token}_{safe_name}"
+    if storage.exists(key):
+        return storage.local_path(key)
+    return save_file(key, content)
 
 
 def is_valid_pdf(content: bytes) -> bool:
@@ -0,0 +1,11 @@
+from google import genai
+from app.config import GOOGLE_API_KEY, GENAI_BACKEND
+
+
+def get_client():
+    """Gemini client, or the deterministic local stand-in when GENAI_BACKEND=fake."""
+    if GENAI_BACKEND == "fake":
+        from app.services.fake_genai import FakeClient
+
+        return FakeClient()
+    return genai.Client(api_key=GOOGLE_API_KEY)
@@ -0,0 +1,107 @@
+import json
+import re
+
+# Strings are matched whole, escapes included, so braces and commas inside them
+# never reach the structural scan. Group 1 is empty for a string cut off at the end.
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*(?:(")|\\?\Z)|[{}\[\],]', re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+_OPENERS = {"object": "{", "array": "["}
+# A truncated tail ending in one of these holds a complete last element
+_COMPLETE_ENDINGS = ('"', "}", "]", "true", "false", "null")
+_decoder = json.JSONDecoder()
+
+
+def _find_start(text: str, expect: str | None) -> int:
+    if expect is not None:
+        return text.find(_OPENERS[expect])
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    return min(starts) if starts else -1
+
+
+def _close(stack) -> str:
+    return "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def extract_json(text: str, expect: str | None = None) -> dict | list:
+    """Extract the first JSON object or array from model output.
+
+    Well-formed JSON is decoded directly; anything else goes through a single
+    string-aware scan that drops trailing commas and recovers output cut off
+    mid-way (e.g. at max_output_tokens) by dropping the incomplete last element
+    and closing open containers. `expect` is "object", "array" or
+    None for whichever comes first. Raises ValueError when nothing usable is found.
+    """
+    text = text or ""
+    if not text.strip():
+        raise ValueError("Empty response from model")
+
+    start = _find_start(text, expect)
+    if start == -1:
+        raise ValueError(f"No JSON {expect or 'value'} found")
+
+    # Well-formed output (the common case) is decoded entirely in C
+    try:
+        return _decoder.raw_decode(text, start)[0]
+    except json.JSONDecodeError:
+        pass
+
+    segments: list[str] = []  # output so far, minus dropped trailing commas
+    seg_start = start
+    stack: list[str] = []
+    pending_comma = -1  # index of a comma not yet followed by a value
+    prev_end = start
+    # Last point where the output is complete once open containers are closed:
+    # (segment count, segment start, text position, open containers)
+    cut_point = None
+
+    for match in _TOKEN.finditer(text, start):
+        pos = match.start()
+        if pending_comma != -1 and text[prev_end:pos].strip():
+            pending_comma = -1  # a number or literal followed the comma
+        prev_end = match.end()
+        token = text[pos]
+
+        if token == '"':
+            pending_comma = -1
+            if match.group(1) is None:
+                break  # string cut off by truncation
+        elif token == ",":
+            if stack:
+                cut_point = (len(segments), seg_start, pos, tuple(stack))
+            pending_comma = pos
+        elif token in _CLOSERS:
+            pending_comma = -1
+            stack.append(token)
+            cut_point = (len(segments), seg_start, prev_end, tuple(stack))
+        else:
+            if not stack or _CLOSERS[stack[-1]] != token:
+                raise ValueError(f"Unbalanced {token!r} at position {pos}")
+            if pending_comma != -1:
+                segments.append(text[seg_start:pending_comma])
+                seg_start = pending_comma + 1
+                pending_comma = -1
+            stack.pop()
+            if not stack:
+                segments.append(text[seg_start:prev_end])
+                return json.loads("".join(segments))
+            cut_point = (len(segments), seg_start, prev_end, tuple(stack))
+
+    # Truncated. Keep the last element if it is visibly complete, otherwise go
+    # back to the last point where every element was.
+    tail = text[seg_start:].rstrip().removesuffix(",").rstrip()
+    if tail.endswith(_COMPLETE_ENDINGS):
+        try:
+            return json.loads("".join(segments) + tail + _close(stack))
+        except json.JSONDecodeError:
+            pass
+
+    # Cutting back to the top-level opener would "recover" an empty {} or [] from
+    # prose that merely contains a brace
+    if cut_point is None or cut_point[2] == start + 1:
+        raise ValueError("Truncated JSON could not be recovered")
+    n_segments, cut_start, cut_pos, cut_stack = cut_point
+    body = "".join(segments[:n_segments]) + text[cut_start:cut_pos]
+    try:
+        return json.loads(body + _close(cut_stack))
+    except json.JSONDecodeError:
+        raise ValueError("Truncated JSON could not be recovered") from None
@@ -1,11 +1,14 @@
 import json
+import logging
 import secrets
 import re
 from sqlalchemy.orm import Session
 from app.models import Menu
-from app.services.ocr_service import extract_menu_from_pdf, translate_menu
-from app.services.qr_service import generate_qr
+from app.services.qr_service import qr_url as build_qr_url
 from app.config import BASE_URL
+from app.metrics import timed, job_context
+
+logger = logging.getLogger(__name__)
 
 
 def _slugify(name: str) -> str:
@@ -18,8 +21,20 @@ def _slugify(name: str) -> str:
 def create_menu(
     db: Session, restaurant_name: str, pdf_path: str, languages: str = "en,fr,es"
 ) -> tuple[Menu, str]:
+    with job_context() as job_id, timed("ingestion"):
+        logger.info("Ingestion job %s started for %r", job_id, restaurant_name)
+        return _create_menu(db, restaurant_name, pdf_path, languages)
+
+
+def _create_menu(
+    db: Session, restaurant_name: str, pdf_path: str, languages: str
+) -> tuple[Menu, str]:
+    # Imported here so the public role doesn't load the ingestion stack
+    from app.services.ocr_service import extract_menu_from_pdf, translate_menu
+
     menu_data = extract_menu_from_pdf(pdf_path)
-    menu_data.setdefault("restaurant_name", restaurant_name)
+    if not menu_data.get("restaurant_name"):
+        menu_data["restaurant_name"] = restaurant_name
 
     lang_list = [l.strip() for l in languages.split(",")]
     translations = {}
@@ -37,7 +52,7 @@ def create_menu(
                 "wines": translated.get("wines", base_menu["wines"]),
             }
         except Exception as e:
-            print(f"Translation to {lang} failed: {e}")
+            logger.warning("Translation to %s failed: %s", lang, e)
             translations[lang] = base_menu
 
     menu_data["translations"] = translations
@@ -55,7 +70,8 @@ def create_menu(
     db.commit()
     db.refresh(menu)
 
-    qr_url = generate_qr(slug)
+    # Rendered on first scan of the URL, not inside the upload request
+    qr_url = build_qr_url(slug)
     public_url = f"{BASE_URL}/menu/{slug}"
 
     return menu, qr_url
@@ -65,6 +81,18 @@ def get_menu_by_slug(db: Session, slug: str) -> Menu | None:
     return db.query(Menu).filter(Menu.slug == slug).first()
 
 
+def list_menu_slugs(db: Session, slugs: list[str] | None = None) -> list[str]:
+    """All menu slugs, or the subset of `slugs` that exist."""
+    query = db.query(Menu.slug)
+    if slugs is not None:
+        query = query.filter(Menu.slug.in_(slugs))
+    return [row.slug for row in query.order_by(Menu.id)]
+
+
+def menu_languages(menu: Menu) -> list[str]:
+    return [l.strip() for l in menu.languages.split(",")]
+
+
 def get_menu_data(menu: Menu, lang: str = "en") -> dict:
     data = json.loads(menu.menu_data)
 
@@ -80,7 +108,7 @@ def get_menu_data(menu: Menu, lang: str = "en") -> dict:
     return {
         "restaurant_name": data.get("restaurant_name", menu.restaurant_name),
         "lang": lang,
-        "available_languages": [l.strip() for l in menu.languages.split(",")],
+        "available_languages": menu_languages(menu),
         "currency": data.get("currency"),
         "sections": sections,
         "wines": wines,
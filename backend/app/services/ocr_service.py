@@ -1,54 +1,122 @@
 import json
-import re
 import base64
+import logging
+import re
 from pdf2image import convert_from_path
 import os
-from google import genai
 from google.genai import types
-from app.config import GOOGLE_API_KEY
+from pydantic import ValidationError
+from app.metrics import timed, record_model_io
+from app.schemas import MenuData, MenuSection, MenuItem, Wine
+from app.services.json_extract import extract_json
+from app.services.genai_client import get_client
 
 MODEL = "gemini-2.5-flash"
 
+logger = logging.getLogger(__name__)
 
-def _client():
-    return genai.Client(api_key=GOOGLE_API_KEY)
 
+def _client():
+    return get_client()
 
-def _extract_json(text: str) -> dict:
-    """Extract JSON from Gemini response, handling common issues"""
-    text = (text or "").strip()
-    if not text:
-        raise ValueError("Empty response from Gemini")
 
-    if "```" in text:
-        text = re.sub(r"```json\s*", "", text)
-        text = re.sub(r"```\s*", "", text)
-        text = text.strip()
+def _prompt_size(contents: list[dict]) -> int:
+    size = 0
+    for content in contents:
+        for part in content["parts"]:
+            size += len(part.get("text") or part.get("inline_data", {}).get("data", ""))
+    return size
 
-    start = text.find("{")
-    if start == -1:
-        raise ValueError("No JSON object found")
 
-    depth = 0
-    end = start
-    for i in range(start, len(text)):
-        if text[i] == "{":
-            depth += 1
-        elif text[i] == "}":
-            depth -= 1
-            if depth == 0:
-                end = i + 1
-                break
+def _generate(client, stage: str, contents: list[dict], config=None, **labels):
+    """generate_content, timed as `stage` with prompt/response sizes recorded."""
+    with timed(stage, **labels):
+        response = client.models.generate_content(
+            model=MODEL, contents=contents, config=config
+        )
+    record_model_io(stage, _prompt_size(contents), len(response.text or ""))
+    return response
+
+
+_THOUSANDS = re.compile(r"^\d{1,3}([.,])\d{3}(\1\d{3})*$")
+
+
+def _parse_price(value) -> float | None:
+    """Read prices as models write them: 12.5, "12,50 €", "€9.50", "1 250,00"."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = re.sub(r"[^\d.,-]", "", str(value))
+    if not re.search(r"\d", text):
+        return None
+    if _THOUSANDS.match(text):
+        text = re.sub(r"[.,]", "", text)
+    elif "," in text and "." in text:
+        # The last separator is the decimal one: "1.250,00" / "1,250.00"
+        decimal = "," if text.rfind(",") > text.rfind(".") else "."
+        text = text.replace("." if decimal == "," else ",", "").replace(decimal, ".")
+    else:
+        text = text.replace(",", ".")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _normalize_item(item: dict) -> dict:
+    """Coerce the usual model quirks before schema validation."""
+    item = dict(item)
+    if "price" in item:
+        item["price"] = _parse_price(item["price"])
+    for key in ("tags", "pairing_tags"):
+        if key in item:
+            value = item[key]
+            if value is None:
+                item[key] = []
+            elif isinstance(value, str):
+                item[key] = [value]
+            elif isinstance(value, list):
+                item[key] = [str(v) for v in value if v is not None]
+    return item
+
+
+def _validate_list(model, items) -> list[dict]:
+    """Validate items one by one, dropping the ones that can't be salvaged."""
+    valid = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            valid.append(model.model_validate(_normalize_item(item)).model_dump())
+        except ValidationError:
+            continue
+    return valid
 
-    json_text = text[start:end]
 
-    try:
-        return json.loads(json_text)
-    except json.JSONDecodeError:
-        # Try to fix trailing comma issues
-        json_text = re.sub(r",\s*}", "}", json_text)
-        json_text = re.sub(r",\s*\]", "]", json_text)
-        return json.loads(json_text)
+def _parse_section(data: dict) -> dict:
+    section = MenuSection(
+        title=str(data["title"]), items=_validate_list(MenuItem, data.get("items"))
+    )
+    return section.model_dump()
+
+
+def _parse_menu(text: str) -> dict:
+    """Extract and validate a full menu from a Gemini response."""
+    data = extract_json(text, expect="object")
+    menu = MenuData(
+        restaurant_name=str(data.get("restaurant_name") or ""),
+        currency=data.get("currency", "EUR"),
+        sections=[
+            _parse_section(s)
+            for s in data.get("sections") or []
+            if isinstance(s, dict) and s.get("title")
+        ],
+        wines=_validate_list(Wine, data.get("wines")),
+    )
+    if not menu.sections and not menu.wines:
+        raise ValueError("No menu sections or wines found in response")
+    return menu.model_dump()
 
 
 EXTRACTION_PROMPT = """
@@ -94,9 +162,10 @@ def extract_menu_from_pdf(pdf_path: str) -> dict:
             temperature=0.1,
         )
 
-        response = client.models.generate_content(
-            model=MODEL,
-            contents=[
+        response = _generate(
+            client,
+            "extract_menu",
+            [
                 {
                     "role": "user",
                     "parts": [
@@ -110,12 +179,14 @@ def extract_menu_from_pdf(pdf_path: str) -> dict:
                     ],
                 }
             ],
-            config=config,
+            config,
+            method="pdf",
         )
-        return _extract_json(response.text or "")
+        return _parse_menu(response.text or "")
     except Exception as e:
-        print(f"Direct PDF failed ({e}), trying image conversion...")
-        images = convert_from_path(pdf_path, dpi=150)
+        logger.warning("Direct PDF failed (%s), trying image conversion...", e)
+        with timed("pdf_to_images"):
+            images = convert_from_path(pdf_path, dpi=150)
 
         parts = [{"text": EXTRACTION_PROMPT}]
 
@@ -136,12 +207,14 @@ def extract_menu_from_pdf(pdf_path: str) -> dict:
             temperature=0.1,
         )
 
-        response = client.models.generate_content(
-            model=MODEL,
-            contents=[{"role": "user", "parts": parts}],
-            config=config,
+        response = _generate(
+            client,
+            "extract_menu",
+            [{"role": "user", "parts": parts}],
+            config,
+            method="images",
         )
-        return _extract_json(response.text or "")
+        return _parse_menu(response.text or "")
 
 
 def extract_menu_from_images(image_paths: list[str]) -> dict:
@@ -156,11 +229,10 @@ def extract_menu_from_images(image_paths: list[str]) -> dict:
         img_base64 = base64.standard_b64encode(img_bytes).decode("utf-8")
         parts.append({"inline_data": {"mime_type": mime, "data": img_base64}})
 
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=[{"role": "user", "parts": parts}],
+    response = _generate(
+        client, "extract_menu", [{"role": "user", "parts": parts}], method="images"
     )
-    return _extract_json(response.text or "")
+    return _parse_menu(response.text or "")
 
 
 def translate_menu(menu_data: dict, target_lang: str) -> dict:
@@ -192,14 +264,20 @@ Keep prices, tags unchanged. Only translate title, names, descriptions.
 Return ONLY valid JSON, same structure."""
 
         try:
-            response = client.models.generate_content(
-                model=MODEL,
-                contents=[{"role": "user", "parts": [{"text": prompt}]}],
-                config=config,
+            response = _generate(
+                client,
+                "translate",
+                [{"role": "user", "parts": [{"text": prompt}]}],
+                config,
+                lang=target_lang,
+                kind="section",
+            )
+            translated_section = _parse_section(
+                extract_json(response.text or "", expect="object")
             )
-            translated_section = _extract_json(response.text or "")
             translated_sections.append(translated_section)
-        except Exception:
+        except Exception as e:
+            logger.warning("Section translation to %s failed: %s", target_lang, e)
             translated_sections.append(section)
     wines = menu_data.get("wines", [])
     translated_wines = wines
@@ -212,17 +290,20 @@ Keep prices, types, pairing_tags unchanged. Only translate names.
 Return ONLY valid JSON array."""
 
         try:
-            response = client.models.generate_content(
-                model=MODEL,
-                contents=[{"role": "user", "parts": [{"text": prompt}]}],
-                config=config,
+            response = _generate(
+                client,
+                "translate",
+                [{"role": "user", "parts": [{"text": prompt}]}],
+                config,
+                lang=target_lang,
+                kind="wines",
+            )
+            validated = _validate_list(
+                Wine, extract_json(response.text or "", expect="array")
             )
-            text = response.text or ""
-            start = text.find("[")
-            end = text.rfind("]") + 1
-            if start >= 0 and end > start:
-                translated_wines = json.loads(text[start:end])
-        except Exception:
-            pass
+            if validated:
+                translated_wines = validated
+        except Exception as e:
+            logger.warning("Wine translation to %s failed: %s", target_lang, e)
 
     return {"sections": translated_sections, "wines": translated_wines}
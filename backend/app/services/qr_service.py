@@ -1,14 +1,155 @@
-import os
+import hashlib
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import qrcode
-from app.config import STORAGE_DIR, BASE_URL
-from app.services.file_service import ensure_dirs
-
-
-def generate_qr(slug: str) -> str:
-    ensure_dirs()
-    url = f"{BASE_URL}/menu/{slug}"
-    filename = f"{slug}.png"
-    path = os.path.join(STORAGE_DIR, "qr", filename)
-    img = qrcode.make(url)
-    img.save(path)
-    return f"{BASE_URL}/storage/qr/{filename}"
+from qrcode.image.svg import SvgPathImage
+from PIL import Image
+from app.config import BASE_URL
+from app.metrics import timed, record_cache
+from app.services.storage_service import storage, save_file, delete_file
+
+QR_FORMATS = ("png", "svg")
+QR_SIZES = (256, 512, 1024)
+DEFAULT_QR_SIZE = 512
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Bump to invalidate every cached render (e.g. after changing the QR styling)
+QR_RENDER_VERSION = "2"
+
+
+def menu_url(slug: str) -> str:
+    return f"{BASE_URL}/menu/{slug}"
+
+
+def qr_digest(slug: str, fmt: str = "png", size: int = DEFAULT_QR_SIZE) -> str:
+    """Hash of everything that determines the rendered image."""
+    key = f"{QR_RENDER_VERSION}|{menu_url(slug)}|{fmt}|{size}"
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+def qr_filename(slug: str, fmt: str = "png", size: int = DEFAULT_QR_SIZE) -> str:
+    digest = qr_digest(slug, fmt, size)
+    if fmt == "svg":
+        return f"{slug}-{digest}.svg"
+    return f"{slug}-{size}-{digest}.{fmt}"
+
+
+def qr_key(slug: str, fmt: str = "png", size: int = DEFAULT_QR_SIZE) -> str:
+    return f"qr/{qr_filename(slug, fmt, size)}"
+
+
+def qr_url(slug: str, fmt: str = "png", size: int = DEFAULT_QR_SIZE) -> str:
+    """Versioned public URL; the image is rendered on first request."""
+    digest = qr_digest(slug, fmt, size)
+    return f"{BASE_URL}/api/public/menus/{slug}/qr.{fmt}?size={size}&v={digest}"
+
+
+def _validate(fmt: str, size: int):
+    if fmt not in QR_FORMATS:
+        raise ValueError(f"Unsupported QR format: {fmt}")
+    if size not in QR_SIZES:
+        raise ValueError(f"Unsupported QR size: {size}")
+
+
+def _render(url: str, fmt: str, size: int) -> bytes:
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=4)
+    qr.add_data(url)
+    qr.make(fit=True)
+    out = io.BytesIO()
+
+    if fmt == "svg":
+        qr.make_image(image_factory=SvgPathImage).save(out)
+        return out.getvalue()
+
+    # Whole-pixel modules; the leftover pixels widen the white quiet zone
+    modules = qr.modules_count + 2 * qr.border
+    qr.box_size = max(1, size // modules)
+    img = qr.make_image().get_image()
+    if img.size != (size, size):
+        canvas = Image.new(img.mode, (size, size), 255)
+        offset = (size - img.size[0]) // 2
+        canvas.paste(img, (offset, offset))
+        img = canvas
+    img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def render_qr(slug: str, fmt: str = "png", size: int = DEFAULT_QR_SIZE) -> str:
+    """Return the storage key of the QR image, rendering it only if not cached."""
+    _validate(fmt, size)
+    key = qr_key(slug, fmt, size)
+    cached = storage.exists(key)
+    record_cache("qr", cached)
+    if not cached:
+        with timed("qr_render", format=fmt):
+            save_file(key, _render(menu_url(slug), fmt, size))
+    return key
+
+
+def generate_qr(slug: str, fmt: str = "png", size: int = DEFAULT_QR_SIZE) -> str:
+    render_qr(slug, fmt, size)
+    return qr_url(slug, fmt, size)
+
+
+def prune_stale_qr(slug: str, keep: set[str]) -> int:
+    """Delete renders of `slug` whose key is not in `keep` (e.g. old BASE_URL)."""
+    # Sizes are spelled out: "{slug}-\d+-" would also match the SVG of another
+    # slug that starts with "{slug}-" and ends in six digits
+    sizes = "|".join(str(size) for size in QR_SIZES)
+    pattern = re.compile(
+        rf"^qr/{re.escape(slug)}-(?:(?:{sizes})-[0-9a-f]{{12}}\.png"
+        rf"|[0-9a-f]{{12}}\.svg)$"
+    )
+    removed = 0
+    for key in storage.list(f"qr/{slug}-"):
+        if pattern.match(key) and key not in keep:
+            delete_file(key)
+            removed += 1
+    return removed
+
+
+def _render_job(job: tuple[str, str, int]) -> str:
+    return generate_qr(*job)
+
+
+def generate_qr_batch(
+    slugs: list[str],
+    formats: tuple[str, ...] = QR_FORMATS,
+    sizes: tuple[int, ...] = (DEFAULT_QR_SIZE,),
+    max_workers: int = 8,
+    processes: bool = False,
+    prune: bool = False,
+) -> dict[str, list[str]]:
+    """Render QR codes for many slugs in parallel, returning their URLs per slug.
+
+    Threads are fine inside the API; the CLI uses processes since rendering is
+    mostly pure Python.
+    """
+    for fmt in formats:
+        for size in sizes:
+            _validate(fmt, size)
+
+    jobs = []
+    for slug in slugs:
+        for fmt in formats:
+            # SVG is resolution independent, render it once
+            for size in sizes if fmt != "svg" else (DEFAULT_QR_SIZE,):
+                jobs.append((slug, fmt, size))
+
+    executor_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_cls(max_workers=max_workers) as executor:
+        urls = list(executor.map(_render_job, jobs))
+
+    results: dict[str, list[str]] = {slug: [] for slug in slugs}
+    for (slug, _, _), url in zip(jobs, urls):
+        results[slug].append(url)
+
+    if prune:
+        keep: dict[str, set[str]] = {slug: set() for slug in slugs}
+        for job in jobs:
+            keep[job[0]].add(qr_key(*job))
+        for slug in slugs:
+            prune_stale_qr(slug, keep[slug])
+
+    return results
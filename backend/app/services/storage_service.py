@@ -0,0 +1,261 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from urllib.parse import quote, unquote
+from app.config import (
+    STORAGE_DIR,
+    STORAGE_BACKEND,
+    STORAGE_VARIANTS,
+    OBJECT_STORE_DIR,
+    BASE_URL,
+)
+
+# Keys written with a content hash at a fixed position never change, e.g.
+# "qr/baronne-a373bc-512-f12663d046bb.png" or "uploads/1f7ae4cabf82daf8_menu.pdf".
+# Anchored so hex runs inside a slug or filename are never taken for the hash.
+_HASHED_KEYS = (
+    re.compile(r"^qr/[^/]+-([0-9a-f]{12})\.(?:png|svg)(?:\.gz|\.webp)?$"),
+    re.compile(r"^uploads/([0-9a-f]{16})_[^/]+$"),
+)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+
+
+@dataclass
+class StoredFile:
+    key: str
+    path: str  # local file the bytes are served from
+    size: int
+    etag: str  # strong ETag, quoted
+    immutable: bool
+
+
+def content_hash(key: str) -> str | None:
+    for pattern in _HASHED_KEYS:
+        match = pattern.match(key)
+        if match:
+            return match.group(1)
+    return None
+
+
+def validate_key(key: str) -> str:
+    parts = key.split("/")
+    if not key or key.startswith("/") or any(p in ("", ".", "..") for p in parts):
+        raise ValueError(f"Invalid storage key: {key!r}")
+    return key
+
+
+class StorageBackend:
+    """Where files under /storage live.
+
+    Keys are the URL path below /storage ("qr/x.png", "uploads/y.pdf"), so
+    switching backends never changes public URLs.
+    """
+
+    def local_path(self, key: str) -> str:
+        """Filesystem path the object is (or would be) stored at."""
+        raise NotImplementedError
+
+    def save(self, key: str, data: bytes) -> str:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def list(self, prefix: str = "") -> list[str]:
+        raise NotImplementedError
+
+    def _digest(self, key: str, path: str, st: os.stat_result) -> str:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.local_path(validate_key(key)))
+
+    def read(self, key: str) -> bytes:
+        with open(self.local_path(validate_key(key)), "rb") as f:
+            return f.read()
+
+    def stat(self, key: str) -> StoredFile | None:
+        path = self.local_path(validate_key(key))
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        digest = content_hash(key)
+        immutable = digest is not None
+        if digest is None:
+            digest = self._digest(key, path, st)
+        return StoredFile(key, path, st.st_size, f'"{digest}"', immutable)
+
+    def url(self, key: str) -> str:
+        return f"{BASE_URL}/storage/{key}"
+
+    def _write(self, path: str, data: bytes):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Unique temp file per writer, so concurrent saves of one key can't collide
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+class LocalStorage(StorageBackend):
+    """Plain directory tree under STORAGE_DIR (the original layout)."""
+
+    def __init__(self, root: str):
+        self.root = root
+        # path -> (mtime_ns, size, digest); one entry per stored file
+        self._digests: dict[str, tuple[int, int, str]] = {}
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def save(self, key: str, data: bytes) -> str:
+        path = self.local_path(validate_key(key))
+        self._write(path, data)
+        return path
+
+    def delete(self, key: str):
+        path = self.local_path(validate_key(key))
+        self._digests.pop(path, None)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str = "") -> list[str]:
+        # Only walk the directory the prefix names ("qr/x-" -> qr/)
+        base = prefix.rsplit("/", 1)[0] if "/" in prefix else ""
+        top = self.local_path(base) if base else self.root
+        keys = []
+        for dirpath, _, filenames in os.walk(top):
+            rel = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            for name in filenames:
+                key = name if rel == "." else f"{rel}/{name}"
+                if key.startswith(prefix) and not name.endswith(".tmp"):
+                    keys.append(key)
+        return sorted(keys)
+
+    def _digest(self, key: str, path: str, st: os.stat_result) -> str:
+        # Unhashed files are hashed once per (mtime, size)
+        cached = self._digests.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:32]
+        self._digests[path] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+
+class ObjectStorage(StorageBackend):
+    """Local stand-in for an object store: a flat bucket of opaque objects.
+
+    Objects are stored by URL-encoded key with a JSON sidecar holding the
+    content hash, the way S3-style stores keep an ETag per object.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, quote(key, safe=""))
+
+    def save(self, key: str, data: bytes) -> str:
+        path = self.local_path(validate_key(key))
+        meta = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+        self._write(path, data)
+        self._write(f"{path}.meta", json.dumps(meta).encode())
+        return path
+
+    def delete(self, key: str):
+        path = self.local_path(validate_key(key))
+        for p in (path, f"{path}.meta"):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def list(self, prefix: str = "") -> list[str]:
+        if not os.path.isdir(self.root):
+            return []
+        keys = [
+            unquote(name)
+            for name in os.listdir(self.root)
+            if not name.endswith((".meta", ".tmp"))
+        ]
+        return sorted(k for k in keys if k.startswith(prefix))
+
+    def _digest(self, key: str, path: str, st: os.stat_result) -> str:
+        try:
+            with open(f"{path}.meta") as f:
+                return json.load(f)["sha256"][:32]
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+        # Sidecar missing or damaged (e.g. object copied in by hand): rebuild it
+        with open(path, "rb") as f:
+            data = f.read()
+        meta = {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+        self._write(f"{path}.meta", json.dumps(meta).encode())
+        return meta["sha256"][:32]
+
+
+def _variants(key: str, data: bytes) -> list[tuple[str, bytes]]:
+    """Precompressed / alternative-format siblings served by content negotiation."""
+    variants = []
+    if key.endswith((".svg", ".json", ".txt", ".html", ".css", ".js")):
+        variants.append((f"{key}.gz", gzip.compress(data, compresslevel=9, mtime=0)))
+    if key.endswith(".png"):
+        from PIL import Image
+
+        out = io.BytesIO()
+        Image.open(io.BytesIO(data)).save(out, format="WEBP", lossless=True)
+        variants.append((f"{key}.webp", out.getvalue()))
+    return variants
+
+
+def save_file(key: str, data: bytes) -> str:
+    """Store `data` under `key` (plus variants when enabled); returns the local path."""
+    path = storage.save(key, data)
+    if STORAGE_VARIANTS:
+        for variant_key, variant_data in _variants(key, data):
+            storage.save(variant_key, variant_data)
+    return path
+
+
+def delete_file(key: str):
+    storage.delete(key)
+    for suffix in (".gz", ".webp"):
+        storage.delete(f"{key}{suffix}")
+
+
+def copy_storage(src: StorageBackend, dst: StorageBackend) -> int:
+    """Copy every object from one backend to another; URLs stay the same."""
+    keys = src.list()
+    for key in keys:
+        dst.save(key, src.read(key))
+    return len(keys)
+
+
+def get_backend(name: str) -> StorageBackend:
+    if name == "local":
+        return LocalStorage(STORAGE_DIR)
+    if name == "objectstore":
+        return ObjectStorage(OBJECT_STORE_DIR)
+    raise ValueError(f"Unknown STORAGE_BACKEND {name!r}")
+
+
+storage = get_backend(STORAGE_BACKEND)
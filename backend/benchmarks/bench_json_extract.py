@@ -0,0 +1,180 @@
+"""Correctness, fuzz and speed checks for `extract_json`.
+
+    python -m benchmarks.bench_json_extract [--json] [--fuzz N] [--repeat N]
+
+- corpus: model outputs in benchmarks/json_corpus/ must match expected.json, and
+  cases with a "menu" entry must also validate to it (prices, null lists)
+- fuzz: truncating large responses at random points must either recover a
+  value or raise ValueError; injected trailing commas must not change the result
+- speed: the previous regex + brace-depth extractor vs the single-pass one, on
+  synthetic extraction responses up to the 16K-token output limit
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from app.services.json_extract import extract_json
+from app.services.ocr_service import _parse_menu
+from benchmarks.synthetic import make_sized_menu
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "json_corpus")
+
+
+def legacy_extract_json(text: str) -> dict:
+    """The extractor `ocr_service` used before, kept as a baseline."""
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("Empty response from Gemini")
+    if "```" in text:
+        text = re.sub(r"```json\s*", "", text)
+        text = re.sub(r"```\s*", "", text)
+        text = text.strip()
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found")
+    depth = 0
+    end = start
+    for i in range(start, len(text)):
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                end = i + 1
+                break
+    json_text = text[start:end]
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        json_text = re.sub(r",\s*}", "}", json_text)
+        json_text = re.sub(r",\s*\]", "]", json_text)
+        return json.loads(json_text)
+
+
+def model_response(size: str, seed: int = 0) -> tuple[str, dict]:
+    menu = make_sized_menu(size, seed=seed)
+    data = {k: menu[k] for k in ("restaurant_name", "currency", "sections", "wines")}
+    text = "```json\n" + json.dumps(data, ensure_ascii=False, indent=2) + "\n```"
+    return text, data
+
+
+def check_corpus() -> dict:
+    with open(os.path.join(CORPUS_DIR, "expected.json"), encoding="utf-8") as f:
+        cases = json.load(f)
+    failures = []
+    for name, case in cases.items():
+        with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+            text = f.read()
+        try:
+            result = extract_json(text, expect=case["expect"])
+        except ValueError as e:
+            result = f"ValueError: {e}"
+        if result != case["result"]:
+            failures.append(name)
+        elif "menu" in case and _parse_menu(text) != case["menu"]:
+            failures.append(f"{name} (menu)")
+    return {"cases": len(cases), "failures": failures}
+
+
+def fuzz(iterations: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    text, data = model_response("medium", seed=seed)
+    recovered = rejected = 0
+    errors = []
+
+    for _ in range(iterations):
+        cut = rng.randint(1, len(text))
+        try:
+            result = extract_json(text[:cut], expect="object")
+            assert isinstance(result, dict)
+            recovered += 1
+        except ValueError:
+            rejected += 1
+        except Exception as e:
+            errors.append(f"truncated at {cut}: {e!r}")
+
+    compact = json.dumps(data, ensure_ascii=False)
+    closers = [m.start() for m in re.finditer(r"[}\]]", compact)]
+    for _ in range(iterations):
+        at = sorted(rng.sample(closers, min(5, len(closers))), reverse=True)
+        mangled = compact
+        for i in at:
+            mangled = mangled[:i] + ",\n " + mangled[i:]
+        try:
+            if extract_json(mangled) != data:
+                errors.append("trailing commas changed the result")
+        except Exception as e:
+            errors.append(f"trailing commas: {e!r}")
+
+    return {
+        "iterations": iterations,
+        "truncated_recovered": recovered,
+        "truncated_rejected": rejected,
+        "errors": errors[:10],
+    }
+
+
+def _time(fn, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def speed(repeat: int) -> list[dict]:
+    rows = []
+    for size in ("small", "medium", "large"):
+        text, data = model_response(size)
+        assert extract_json(text) == legacy_extract_json(text) == data
+        rows.append(
+            {
+                "size": size,
+                "chars": len(text),
+                "legacy_ms": round(_time(legacy_extract_json, text, repeat), 3),
+                "single_pass_ms": round(_time(extract_json, text, repeat), 3),
+            }
+        )
+    return rows
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="extract_json benchmark and fuzz")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--fuzz", type=int, default=500, help="fuzz iterations")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    report = {
+        "corpus": check_corpus(),
+        "fuzz": fuzz(args.fuzz),
+        "speed": speed(args.repeat),
+    }
+    ok = not report["corpus"]["failures"] and not report["fuzz"]["errors"]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0 if ok else 1
+
+    corpus, fz = report["corpus"], report["fuzz"]
+    print(f"corpus: {corpus['cases'] - len(corpus['failures'])}/{corpus['cases']} ok")
+    for name in corpus["failures"]:
+        print(f"  FAIL {name}")
+    print(
+        f"fuzz:   {fz['truncated_recovered']} truncations recovered, "
+        f"{fz['truncated_rejected']} rejected, {len(fz['errors'])} errors"
+    )
+    for error in fz["errors"]:
+        print(f"  {error}")
+    for row in report["speed"]:
+        print(
+            f"{row['size']:>6}: {row['chars']:>7} chars  "
+            f"legacy {row['legacy_ms']:.2f} ms -> single-pass {row['single_pass_ms']:.2f} ms"
+        )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
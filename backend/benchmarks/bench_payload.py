@@ -0,0 +1,100 @@
+"""Bytes saved and encode time for public menu payloads.
+
+    python -m benchmarks.bench_payload [--json] [--repeat N]
+
+Compares FastAPI's default JSON path (jsonable_encoder + json.dumps) with
+orjson, and gzip/brotli sizes at the levels used by `app.responses`.
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+from fastapi.encoders import jsonable_encoder
+from app.responses import dumps, brotli
+from app.schemas import PublicMenuResponse
+from benchmarks.synthetic import SIZES, make_sized_menu
+
+
+def _time(fn, repeat: int) -> tuple[float, object]:
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def public_payload(menu: dict, lang: str = "fr") -> dict:
+    translated = menu["translations"][lang]
+    return PublicMenuResponse(
+        restaurant_name=menu["restaurant_name"],
+        lang=lang,
+        available_languages=list(menu["translations"]),
+        currency=menu["currency"],
+        sections=translated["sections"],
+        wines=translated["wines"],
+    ).model_dump()
+
+
+def bench(size: str, repeat: int) -> dict:
+    data = public_payload(make_sized_menu(size))
+
+    def default_encode():
+        return json.dumps(
+            jsonable_encoder(data), ensure_ascii=False, allow_nan=False,
+            indent=None, separators=(",", ":"),
+        ).encode()
+
+    default_ms, raw = _time(default_encode, repeat)
+    orjson_ms, body = _time(lambda: dumps(data), repeat)
+
+    row = {
+        "size": size,
+        "bytes": len(body),
+        "default_encode_ms": round(default_ms, 3),
+        "orjson_encode_ms": round(orjson_ms, 3),
+    }
+    assert json.loads(raw) == json.loads(body)
+
+    for level in (6, 9):
+        ms, out = _time(lambda: gzip.compress(body, compresslevel=level, mtime=0), repeat)
+        row[f"gzip{level}_bytes"] = len(out)
+        row[f"gzip{level}_ms"] = round(ms, 3)
+    if brotli is not None:
+        for quality in (4, 9):
+            ms, out = _time(
+                lambda: brotli.compress(body, quality=quality, mode=brotli.MODE_TEXT), repeat
+            )
+            row[f"br{quality}_bytes"] = len(out)
+            row[f"br{quality}_ms"] = round(ms, 3)
+    return row
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Public menu payload benchmark")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rows = [bench(size, args.repeat) for size in SIZES]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    for row in rows:
+        print(
+            f"{row['size']:>9}: {row['bytes']:>8} B  "
+            f"encode {row['default_encode_ms']:.2f} ms -> {row['orjson_encode_ms']:.2f} ms (orjson)"
+        )
+        for key in sorted(k for k in row if k.endswith("_bytes") and k != "bytes"):
+            name = key[: -len("_bytes")]
+            saved = 100 * (1 - row[key] / row["bytes"])
+            print(
+                f"           {name:>6}: {row[key]:>8} B ({saved:4.1f}% saved) "
+                f"in {row[name + '_ms']:.2f} ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
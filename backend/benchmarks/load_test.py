@@ -0,0 +1,325 @@
+"""Offline load test for the menu read, chat and ingestion paths.
+
+Runs against the app in-process (default) or a running server (--url), with
+Gemini replaced by app/services/fake_genai.py. Requires httpx.
+
+    python -m benchmarks.load_test --scenario all --concurrency 16 --requests 200
+    python -m benchmarks.load_test --scenario stream --latency-ms 500 --chunk-size 8
+    GENAI_BACKEND=fake uvicorn app.main:app --port 8000 &
+    python -m benchmarks.load_test --url http://localhost:8000 --scenario menu
+
+Prints a JSON report with p50/p90/p99 latency, time to first byte for
+streams, and throughput per scenario. In-process, the app and the fake share
+this process, so compare runs against each other rather than with production.
+Chat admission limits (CHAT_* environment variables) apply as usual; 429s
+show up in each scenario's status counts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+SCENARIOS = ("menu", "chat", "stream", "upload")
+
+# Smallest thing is_valid_pdf accepts and upload_menu doesn't reject as too small
+FAKE_PDF = b"%PDF-1.4\n" + b"% synthetic benchmark document\n" * 8 + b"%%EOF\n"
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, results: list[dict], elapsed: float) -> dict:
+    latencies = [r["latency"] * 1000 for r in results if r["ok"]]
+    statuses: dict[str, int] = {}
+    for r in results:
+        statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+    summary = {
+        "scenario": name,
+        "requests": len(results),
+        "errors": sum(1 for r in results if not r["ok"]),
+        "statuses": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        },
+    }
+    ttfb = [r["ttfb"] * 1000 for r in results if r["ok"] and r.get("ttfb") is not None]
+    if ttfb:
+        summary["ttfb_ms"] = {
+            "p50": round(percentile(ttfb, 50), 2),
+            "p90": round(percentile(ttfb, 90), 2),
+            "p99": round(percentile(ttfb, 99), 2),
+        }
+    return summary
+
+
+class FirstByteRecorder:
+    """ASGI wrapper noting when the first body chunk of each request is sent.
+
+    httpx's ASGITransport buffers whole responses, so in-process stream timing
+    has to be taken on the server side of the transport.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.first_byte: dict[str, float] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode()
+
+        async def wrapped_send(message):
+            if (
+                message["type"] == "http.response.body"
+                and message.get("body")
+                and request_id not in self.first_byte
+            ):
+                self.first_byte[request_id] = time.perf_counter()
+            await send(message)
+
+        await self.app(scope, receive, wrapped_send)
+
+
+class Runner:
+    def __init__(self, client, slugs: list[str], languages: list[str], recorder=None):
+        self.client = client
+        self.slugs = slugs
+        self.languages = languages
+        self.recorder = recorder
+        self.rng = random.Random(0)
+
+    def _pick(self) -> tuple[str, str]:
+        return self.rng.choice(self.slugs), self.rng.choice(self.languages)
+
+    def _chat_body(self, lang: str) -> dict:
+        question = self.rng.choice(
+            ["What goes well with fish?", "Any vegetarian dishes?", "Which red wine?"]
+        )
+        return {
+            "messages": [{"role": "user", "content": question}],
+            "lang": lang,
+            "session_id": f"bench-{uuid.uuid4().hex[:12]}",
+        }
+
+    async def menu(self) -> dict:
+        slug, lang = self._pick()
+        start = time.perf_counter()
+        r = await self.client.get(
+            f"/api/public/menus/{slug}",
+            params={"lang": lang},
+            headers={"Accept-Encoding": "br, gzip"},
+        )
+        return {"ok": r.status_code == 200, "status": r.status_code,
+                "latency": time.perf_counter() - start}
+
+    async def chat(self) -> dict:
+        slug, lang = self._pick()
+        start = time.perf_counter()
+        r = await self.client.post(f"/api/public/menus/{slug}/chat", json=self._chat_body(lang))
+        return {"ok": r.status_code == 200, "status": r.status_code,
+                "latency": time.perf_counter() - start}
+
+    async def stream(self) -> dict:
+        slug, lang = self._pick()
+        request_id = uuid.uuid4().hex
+        start = time.perf_counter()
+        first_byte = None
+        body = b""
+        async with self.client.stream(
+            "POST",
+            f"/api/public/menus/{slug}/chat/stream",
+            json=self._chat_body(lang),
+            headers={"X-Request-ID": request_id},
+        ) as r:
+            async for chunk in r.aiter_bytes():
+                if first_byte is None and chunk:
+                    first_byte = time.perf_counter()
+                body += chunk
+        end = time.perf_counter()
+        if self.recorder is not None:
+            first_byte = self.recorder.first_byte.pop(request_id, first_byte)
+        ok = r.status_code == 200 and b"data: [DONE]" in body
+        return {"ok": ok, "status": r.status_code, "latency": end - start,
+                "ttfb": (first_byte - start) if first_byte else None}
+
+    async def upload(self) -> dict:
+        start = time.perf_counter()
+        r = await self.client.post(
+            "/api/menus",
+            data={"restaurant_name": "Bench Bistro", "languages": ",".join(self.languages)},
+            files={"pdf": ("menu.pdf", FAKE_PDF + uuid.uuid4().bytes, "application/pdf")},
+        )
+        result = {"ok": r.status_code == 200, "status": r.status_code,
+                  "latency": time.perf_counter() - start}
+        if r.status_code == 200:
+            result["slug"] = r.json()["slug"]
+        return result
+
+
+async def run_scenario(runner: Runner, name: str, total: int, concurrency: int) -> dict:
+    do_request = getattr(runner, name)
+    results: list[dict] = []
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                results.append(await do_request())
+            except Exception as e:
+                results.append({"ok": False, "status": type(e).__name__,
+                                "latency": time.perf_counter() - start})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    return summarize(name, results, time.perf_counter() - start)
+
+
+def configure_env(args, workdir: str):
+    """Point the in-process app at a scratch database and the fake model."""
+    os.environ.update(
+        GENAI_BACKEND="fake",
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        STORAGE_DIR=os.path.join(workdir, "storage"),
+        FAKE_GENAI_LATENCY_MS=str(args.latency_ms),
+        FAKE_GENAI_CHUNK_SIZE=str(args.chunk_size),
+        FAKE_GENAI_CHUNK_DELAY_MS=str(args.chunk_delay_ms),
+        FAKE_GENAI_RESPONSE_CHARS=str(args.response_chars),
+        FAKE_GENAI_MENU_SECTIONS=str(args.sections),
+        FAKE_GENAI_MENU_ITEMS=str(args.items),
+        FAKE_GENAI_MENU_WINES=str(args.wines),
+    )
+
+
+def seed_menus(args, languages: list[str]) -> list[str]:
+    """Insert synthetic menus directly, skipping extraction."""
+    from app.db import SessionLocal
+    from app.models import Menu
+    from benchmarks.synthetic import make_menu
+
+    db = SessionLocal()
+    slugs = []
+    try:
+        for i in range(args.menus):
+            data = make_menu(args.sections, args.items, args.wines, tuple(languages), seed=i)
+            slug = f"bench-{i}-{uuid.uuid4().hex[:6]}"
+            db.add(Menu(
+                restaurant_name=data["restaurant_name"],
+                slug=slug,
+                pdf_path="bench.pdf",
+                languages=",".join(languages),
+                menu_data=json.dumps(data, ensure_ascii=False),
+            ))
+            slugs.append(slug)
+        db.commit()
+    finally:
+        db.close()
+    return slugs
+
+
+async def main_async(args) -> dict:
+    import httpx
+
+    languages = [lang.strip() for lang in args.languages.split(",")]
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    recorder = None
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        workdir = tempfile.mkdtemp(prefix="easyq-bench-")
+        configure_env(args, workdir)
+        from app.main import create_app
+
+        recorder = FirstByteRecorder(create_app("all"))
+        transport = httpx.ASGITransport(app=recorder)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                   timeout=args.timeout)
+
+    report = {
+        "target": args.url or "in-process",
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "upload_requests": args.upload_requests,
+            "menus": args.menus,
+            "sections": args.sections,
+            "items": args.items,
+            "wines": args.wines,
+            "languages": languages,
+            "latency_ms": args.latency_ms,
+            "chunk_size": args.chunk_size,
+            "chunk_delay_ms": args.chunk_delay_ms,
+        },
+        "scenarios": {},
+    }
+
+    async with client:
+        runner = Runner(client, [], languages, recorder)
+        if args.url:
+            # No database access: seed through the upload endpoint (server must run the fake)
+            seeded = [await runner.upload() for _ in range(args.menus)]
+            runner.slugs = [r["slug"] for r in seeded if r["ok"]]
+            if not runner.slugs:
+                raise SystemExit("Seeding via /api/menus failed; is GENAI_BACKEND=fake set?")
+        else:
+            runner.slugs = seed_menus(args, languages)
+
+        for name in scenarios:
+            total = args.upload_requests if name == "upload" else args.requests
+            report["scenarios"][name] = await run_scenario(
+                runner, name, total, args.concurrency
+            )
+    return report
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Offline load test with a fake model")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--url", help="benchmark a running server instead of in-process")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="per scenario")
+    parser.add_argument("--upload-requests", type=int, default=4)
+    parser.add_argument("--menus", type=int, default=10, help="menus to seed")
+    parser.add_argument("--sections", type=int, default=8)
+    parser.add_argument("--items", type=int, default=12, help="items per section")
+    parser.add_argument("--wines", type=int, default=60)
+    parser.add_argument("--languages", default="en,fr,es")
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=24)
+    parser.add_argument("--chunk-delay-ms", type=int, default=20)
+    parser.add_argument("--response-chars", type=int, default=400)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(main_async(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    return 1 if any(s["errors"] for s in report["scenarios"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
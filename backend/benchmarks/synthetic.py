@@ -0,0 +1,41 @@
+"""Synthetic menus shaped like `ocr_service` output, for benchmarks."""
+import random
+from app.services.fake_genai import make_sections, make_wines, phrase
+
+SIZES = {
+    "small": {"sections": 4, "items": 6, "wines": 10},
+    "medium": {"sections": 8, "items": 12, "wines": 60},
+    "large": {"sections": 12, "items": 20, "wines": 400},
+    "wine_list": {"sections": 16, "items": 30, "wines": 1500},
+}
+
+
+def make_menu(
+    sections: int = 8,
+    items: int = 12,
+    wines: int = 60,
+    languages: tuple[str, ...] = ("en", "fr", "es"),
+    seed: int = 0,
+) -> dict:
+    """Menu data as stored in `Menu.menu_data`, including per-language translations."""
+    rng = random.Random(seed)
+    base_sections = make_sections(rng, sections, items)
+    base_wines = make_wines(rng, wines)
+    return {
+        "restaurant_name": f"Restaurant {phrase(rng, 2).title()}",
+        "currency": "EUR",
+        "sections": base_sections,
+        "wines": base_wines,
+        "translations": {
+            lang: {
+                "sections": make_sections(rng, sections, items),
+                "wines": make_wines(rng, wines),
+            }
+            for lang in languages
+        },
+    }
+
+
+def make_sized_menu(size: str, seed: int = 0, **overrides) -> dict:
+    params = dict(SIZES[size], **overrides)
+    return make_menu(seed=seed, **params)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Render QR codes for many menus in parallel.
+
+    python generate_qr.py                       # every menu, PNG + SVG at 512px
+    python generate_qr.py baronne-a373bc --size 256 --size 1024
+    python generate_qr.py --prune               # also drop renders for an old BASE_URL
+"""
+import argparse
+import os
+from app.db import SessionLocal
+from app.services.menu_service import list_menu_slugs
+from app.services.qr_service import (
+    generate_qr_batch,
+    QR_FORMATS,
+    QR_SIZES,
+    DEFAULT_QR_SIZE,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("slugs", nargs="*", help="menu slugs (default: all menus)")
+    parser.add_argument("--format", action="append", choices=QR_FORMATS, dest="formats")
+    parser.add_argument("--size", action="append", type=int, choices=QR_SIZES, dest="sizes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--prune", action="store_true", help="remove stale renders")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        slugs = list_menu_slugs(db, args.slugs or None)
+    finally:
+        db.close()
+
+    results = generate_qr_batch(
+        slugs,
+        tuple(args.formats or QR_FORMATS),
+        tuple(args.sizes or (DEFAULT_QR_SIZE,)),
+        max_workers=args.workers,
+        processes=True,
+        prune=args.prune,
+    )
+    for slug, urls in results.items():
+        for url in urls:
+            print(f"{slug}: {url}")
+    print(f"Generated QR codes for {len(results)} menus")
+
+
+if __name__ == "__main__":
+    main()
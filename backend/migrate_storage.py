@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Copy stored files between storage backends without changing their URLs.
+
+    python migrate_storage.py local objectstore
+    STORAGE_BACKEND=objectstore uvicorn app.main:app
+"""
+import sys
+from app.services.storage_service import get_backend, copy_storage
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2:
+        print(__doc__)
+        return 1
+    src, dst = (get_backend(name) for name in argv)
+    count = copy_storage(src, dst)
+    print(f"Copied {count} files from {argv[0]} to {argv[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
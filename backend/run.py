@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Run the public API and the ingestion worker side by side.
+
+The public app (menus, chat, QR/static files) and the ingestion app (PDF
+uploads) share the same database but run as separate uvicorn processes, each
+with its own port and worker count:
+
+    python run.py            # both roles
+    python run.py public     # only the public app
+    python run.py --reload   # both roles, auto-reload (single worker each)
+"""
+import argparse
+import subprocess
+import sys
+from app.config import PUBLIC_PORT, PUBLIC_WORKERS, INGEST_PORT, INGEST_WORKERS
+
+ROLES = {
+    "public": ("app.main:create_public_app", PUBLIC_PORT, PUBLIC_WORKERS),
+    "ingest": ("app.main:create_ingest_app", INGEST_PORT, INGEST_WORKERS),
+}
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Run the public and ingestion apps")
+    parser.add_argument("roles", nargs="*", help=f"any of {', '.join(ROLES)} (default: all)")
+    parser.add_argument("--reload", action="store_true", help="auto-reload, one worker")
+    args = parser.parse_args(argv)
+    # Checked by hand: argparse rejects an empty nargs="*" list against choices
+    for role in args.roles:
+        if role not in ROLES:
+            parser.error(f"unknown role {role!r} (choose from {', '.join(ROLES)})")
+    roles = args.roles or list(ROLES)
+
+    procs = []
+    for role in roles:
+        factory, port, workers = ROLES[role]
+        cmd = [sys.executable, "-m", "uvicorn", factory, "--factory", "--port", str(port)]
+        cmd += ["--reload"] if args.reload else ["--workers", str(workers)]
+        print(f"Starting {role} app on port {port}")
+        procs.append(subprocess.Popen(cmd))
+
+    try:
+        for p in procs:
+            p.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait()
+    return max((p.returncode or 0) for p in procs)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -6,6 +6,12 @@ export default defineConfig({
   server: {
     port: 5173,
     proxy: {
+      // With the role-split backend (`python run.py`), send uploads to the
+      // ingestion worker: VITE_INGEST_TARGET=http://localhost:8001 npm run dev
+      '/api/menus': {
+        target: process.env.VITE_INGEST_TARGET || 'http://localhost:8000',
+        changeOrigin: true,
+      },
       '/api': {
         target: 'http://localhost:8000',
         changeOrigin: true,